@@ -40,7 +40,7 @@ class SpotifyOAuth(object):
     TOKEN_ENDPOINT = "https://accounts.spotify.com/api/token"
 
     def __init__(self, client_id, client_secret, redirect_uri,
-                 state=None, scope=None, show_dialog=False, cache_path=None):
+                 state=None, scope=None, show_dialog=False, cache_path=None, session=None):
         self.client_id = client_id
         self.client_secret = client_secret
         self.redirect_uri = redirect_uri
@@ -48,6 +48,7 @@ class SpotifyOAuth(object):
         self.scope = scope or []
         self.show_dialog = show_dialog
         self.cache_path = cache_path
+        self.session = session or requests  # Pass a shared Session to reuse connections.
 
         self.token_info = self.get_cached_token()
 
@@ -112,11 +113,11 @@ class SpotifyOAuth(object):
 
     def get_access_and_refresh_tokens(self, code):
         basic_auth = make_basic_authorization(self.client_id, self.client_secret)
-        response = requests.post(SpotifyOAuth.TOKEN_ENDPOINT,
-                                 data={"grant_type": "authorization_code",
-                                       "code": code,
-                                       "redirect_uri": self.redirect_uri},
-                                 headers={"Authorization": basic_auth})
+        response = self.session.post(SpotifyOAuth.TOKEN_ENDPOINT,
+                                     data={"grant_type": "authorization_code",
+                                           "code": code,
+                                           "redirect_uri": self.redirect_uri},
+                                     headers={"Authorization": basic_auth})
 
         if response.status_code == requests.codes.OK:
             token = AccessToken(**response.json())
@@ -128,10 +129,10 @@ class SpotifyOAuth(object):
 
     def refresh_token(self, refresh_token):
         basic_auth = make_basic_authorization(self.client_id, self.client_secret)
-        response = requests.post(SpotifyOAuth.TOKEN_ENDPOINT,
-                                 data={"grant_type": "refresh_token",
-                                       "refresh_token": refresh_token},
-                                 headers={"Authorization": basic_auth})
+        response = self.session.post(SpotifyOAuth.TOKEN_ENDPOINT,
+                                     data={"grant_type": "refresh_token",
+                                           "refresh_token": refresh_token},
+                                     headers={"Authorization": basic_auth})
 
         if response.status_code == requests.codes.OK:
             token = AccessToken(**response.json(),
@@ -182,7 +183,7 @@ class AccessToken(object):
         self.access_token = kwargs.get("access_token", None)
         self.token_type = kwargs.get("token_type", None)
         self.expires_in = kwargs.get("expires_in", None)
-        self.expires_at = time.time() + self.expires_in
+        self.expires_at = kwargs.get("expires_at") or time.time() + self.expires_in  # Cached tokens keep theirs.
         self.scope = kwargs.get("scope", None)
         if self.scope is not None:
             if isinstance(self.scope, str):
@@ -1,9 +1,10 @@
-import base64
 import json
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin
 
 from spotify.auth import SpotifyClientCredentials, SpotifyOAuth
+from spotify.images import MAX_COVER_IMAGE_SIZE, encode_cover_image
 
 
 # TODO: Handle Paging Objects
@@ -21,7 +22,7 @@ def slash_join(*args):
 
 
 class Spotify(object):
-    def __init__(self, auth: SpotifyOAuth = None, client_id=None, client_secret=None, market=None):
+    def __init__(self, auth: SpotifyOAuth = None, client_id=None, client_secret=None, market=None, session=None):
         if auth:
             self.auth = auth
         elif client_id and client_secret:
@@ -31,6 +32,7 @@ class Spotify(object):
 
         self.base_endpoint = "https://api.spotify.com/v1"
         self.market = market
+        self.session = session or requests.Session()  # Reuses connections between requests.
 
     def _request(self, method, endpoint, query=None, payload=None, content_type="application/json"):
         url = slash_join(self.base_endpoint, endpoint)
@@ -41,11 +43,11 @@ class Spotify(object):
         if self.market:
             query["market"] = self.market
 
-        response = requests.request(method, url, headers=headers, params=query, data=payload)
+        response = self.session.request(method, url, headers=headers, params=query, data=payload)
 
         # print(response.status_code, response.content, response.headers)
 
-        if response.status_code == requests.codes.OK:
+        if 200 <= response.status_code < 300:  # Some endpoints answer 201 Created or 202 Accepted.
             if response.content:  # Some requests have empty bodies...
                 return response.json()
             else:
@@ -163,16 +165,49 @@ class Spotify(object):
 
         return self._request("POST", endpoint, payload=json.dumps(payload))
 
-    def upload_custom_playlist_cover_image(self, playlist_id, image_path):
+    def upload_custom_playlist_cover_image(self, playlist_id, image_path, max_size=MAX_COVER_IMAGE_SIZE):
+        """
+        `image_path` can be a path, bytes or a binary file object containing a JPEG. Images whose encoded
+        payload exceeds `max_size` are re-encoded and downsized to fit (requires Pillow).
+        """
         endpoint = slash_join("playlists", playlist_id, "images")
-        with open(image_path, 'rb') as jpg_file:
-            jpg_data = jpg_file.read()
-
-        encoded_jpg = base64.b64encode(jpg_data).decode()
-        print(encoded_jpg)
+        encoded_jpg = encode_cover_image(image_path, max_size=max_size)
 
         return self._request("PUT", endpoint, content_type="image/jpg", payload=encoded_jpg)
 
+    def upload_custom_playlist_cover_images(self, covers, max_workers=4, max_size=MAX_COVER_IMAGE_SIZE):
+        """
+        Upload cover images for many playlists concurrently. `covers` maps playlist IDs to images, in any
+        form accepted by `upload_custom_playlist_cover_image`, or is an iterable of (playlist_id, image) pairs.
+
+        Returns a dict mapping each playlist ID to its upload result, or to the exception raised for it.
+        Uploads the API rejects are reported as a `SpotifyError`.
+        """
+        covers = list(covers.items() if hasattr(covers, "items") else covers)
+        playlist_ids = [playlist_id for playlist_id, _ in covers]
+        if len(set(playlist_ids)) != len(playlist_ids):
+            raise ClientError("Duplicate playlist IDs in covers")
+
+        def upload(playlist_id, image):
+            result = self.upload_custom_playlist_cover_image(playlist_id, image, max_size=max_size)
+            if result is None:
+                raise SpotifyError(f"Cover image upload failed for playlist {playlist_id}")
+
+            return result
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {playlist_id: executor.submit(upload, playlist_id, image)
+                       for playlist_id, image in covers}
+
+        results = {}
+        for playlist_id, future in futures.items():
+            try:
+                results[playlist_id] = future.result()
+            except Exception as e:
+                results[playlist_id] = e
+
+        return results
+
     def get_playlist_cover_image(self, playlist_id):
         endpoint = slash_join("playlists", playlist_id, "images")
 
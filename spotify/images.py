@@ -0,0 +1,90 @@
+import base64
+import io
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is only needed to shrink images that are over the limit.
+    Image = None
+
+
+MAX_COVER_IMAGE_SIZE = 256 * 1024  # Limit on the base64 encoded payload, in bytes.
+
+JPEG_QUALITIES = (85, 75, 65, 55, 45)
+MIN_DIMENSION = 64
+
+
+class ImageError(Exception):
+    pass
+
+
+def encoded_size(size):
+    """
+    Length of the base64 encoding of `size` bytes.
+    """
+    return 4 * ((size + 2) // 3)
+
+
+def read_image(image):
+    """
+    Return the raw bytes of `image`, which can be a path, a bytes-like object or a binary file object.
+    Bytes-like objects are returned as is rather than copied.
+    """
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        return image
+
+    if hasattr(image, "read"):
+        data = image.read()
+        if not isinstance(data, (bytes, bytearray)):
+            raise ImageError(f"Expected bytes from image file object, got {type(data).__name__}. "
+                             f"Open the file in binary mode.")
+
+        return data
+
+    with open(image, 'rb') as f:
+        return f.read()
+
+
+def fit_cover_image(data, max_size=MAX_COVER_IMAGE_SIZE):
+    """
+    Re-encode and downsize the JPEG in `data` until its base64 encoding fits within `max_size` bytes.
+    Images that already fit are returned untouched. Requires Pillow for images that do not.
+    """
+    if encoded_size(len(data)) <= max_size:
+        return data
+
+    if Image is None:
+        raise ImageError(f"Image is {encoded_size(len(data))} bytes once encoded, over the {max_size} byte limit. "
+                         f"Install Pillow to have it resized automatically.")
+
+    try:
+        with Image.open(io.BytesIO(data)) as original:
+            image = original.convert("RGB")
+    except (OSError, ValueError, Image.DecompressionBombError) as e:  # UnidentifiedImageError is an OSError.
+        raise ImageError(f"Unable to decode image: {e}") from e
+
+    while True:
+        for quality in JPEG_QUALITIES:
+            buffer = io.BytesIO()
+            try:
+                image.save(buffer, format="JPEG", quality=quality, optimize=True)
+            except (OSError, ValueError) as e:
+                raise ImageError(f"Unable to encode image: {e}") from e
+
+            size = buffer.tell()
+            if encoded_size(size) <= max_size:
+                return buffer.getvalue()
+
+        # Pixel count scales roughly with file size, so shrink each side by the square root of the overshoot.
+        scale = min(0.9, (max_size / encoded_size(size)) ** 0.5)
+        width, height = int(image.width * scale), int(image.height * scale)
+        if min(width, height) < MIN_DIMENSION:
+            raise ImageError(f"Unable to fit image within {max_size} bytes")
+
+        image = image.resize((width, height), Image.LANCZOS)
+
+
+def encode_cover_image(image, max_size=MAX_COVER_IMAGE_SIZE):
+    """
+    Read, fit and base64 encode `image` as a playlist cover upload payload.
+    """
+    return base64.b64encode(fit_cover_image(read_image(image), max_size=max_size))
@@ -0,0 +1,397 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from spotify.auth import AuthorizationError, SpotifyOAuth
+from spotify.client import Spotify
+
+
+class FileTokenStore(object):
+    """
+    Loads per-user OAuth tokens from `<directory>/<user_id>.json`, in the format written by
+    `SpotifyOAuth.cache_token`. Any object with a `load(user_id)` method returning an authenticated
+    `SpotifyOAuth` can be used as a token store instead.
+    """
+
+    def __init__(self, directory, client_id, client_secret, redirect_uri, scope=None, session=None):
+        self.directory = directory
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.redirect_uri = redirect_uri
+        self.scope = scope
+        self.session = session
+
+    def path(self, user_id):
+        user_id = str(user_id)
+        if os.path.basename(user_id) != user_id:
+            raise ValueError(f"Invalid user id: {user_id!r}")
+
+        return os.path.join(self.directory, f"{user_id}.json")
+
+    def load(self, user_id):
+        auth = SpotifyOAuth(self.client_id, self.client_secret, self.redirect_uri,
+                            scope=self.scope, cache_path=self.path(user_id), session=self.session)
+
+        if auth.token_info is None:
+            raise AuthorizationError(f"No cached token for user {user_id}")
+
+        return auth
+
+
+class _TokenBucket(object):
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate, capacity, now):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    @property
+    def full(self):
+        return self.tokens >= self.capacity
+
+    def delay(self):
+        """
+        Seconds until a whole token is available.
+        """
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class _Waiter(object):
+    __slots__ = ("event", "granted")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.granted = False
+
+
+class FairScheduler(object):
+    """
+    Enforces a global request budget and a per-user budget, both as token buckets refilled at `rate` and
+    `user_rate` requests per second. Users with pending requests take turns round-robin, so one heavy
+    user can't starve the others. Buckets of idle users are dropped once they have refilled.
+
+    Each blocked request waits on its own event and is only woken when granted. One of them, the
+    timekeeper, also sleeps until the next budget refill and hands out grants when it wakes.
+    """
+
+    def __init__(self, rate=10.0, user_rate=1.0, burst=None, user_burst=None, sweep_interval=60.0):
+        self.rate = rate
+        self.user_rate = user_rate
+        self.user_burst = user_burst or max(1.0, user_rate)
+        self.sweep_interval = sweep_interval
+
+        now = time.monotonic()
+        self._global = _TokenBucket(rate, burst or max(1.0, rate), now)
+        self._buckets = {}
+        self._queues = {}  # user_id -> deque of pending waiters.
+        self._ready = deque()  # Users with pending requests and budget to spare, in round-robin order.
+        self._throttled = []  # Heap of (ready_at, seq, user_id) for users waiting on their own budget.
+        self._scheduled = set()  # Users in either `_ready` or `_throttled`.
+        self._seq = itertools.count()
+        self._timekeeper = None
+        self._last_sweep = now
+        self._lock = threading.Lock()
+
+    def acquire(self, user_id):
+        """
+        Block until `user_id` may make a request.
+        """
+        waiter = _Waiter()
+        with self._lock:
+            now = time.monotonic()
+            queue = self._queues.get(user_id)
+            if queue is None:
+                queue = self._queues[user_id] = deque()
+
+            queue.append(waiter)
+            if user_id not in self._scheduled:
+                self._schedule(user_id, now)
+
+            self._dispatch(now)
+
+        try:
+            while True:
+                with self._lock:
+                    if waiter.granted:
+                        return
+
+                    if self._timekeeper is None:
+                        self._timekeeper = waiter
+
+                    timeout = self._next_delay(time.monotonic()) if self._timekeeper is waiter else None
+
+                waiter.event.wait(timeout)
+
+                with self._lock:
+                    waiter.event.clear()
+                    if not waiter.granted:
+                        self._dispatch(time.monotonic())
+
+        except BaseException:
+            with self._lock:
+                self._cancel(user_id, waiter)
+            raise
+
+    def _bucket(self, user_id, now):
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            bucket = self._buckets[user_id] = _TokenBucket(self.user_rate, self.user_burst, now)
+        else:
+            bucket.refill(now)
+
+        return bucket
+
+    def _schedule(self, user_id, now):
+        bucket = self._bucket(user_id, now)
+        if bucket.tokens >= 1:
+            self._ready.append(user_id)
+        else:
+            heapq.heappush(self._throttled, (now + bucket.delay(), next(self._seq), user_id))
+
+        self._scheduled.add(user_id)
+
+    def _dispatch(self, now):
+        """
+        Grant as many pending requests as the budgets allow.
+        """
+        self._global.refill(now)
+        while self._throttled and self._throttled[0][0] <= now:
+            self._ready.append(heapq.heappop(self._throttled)[2])
+
+        while self._ready and self._global.tokens >= 1:
+            user_id = self._ready.popleft()
+            self._scheduled.discard(user_id)
+
+            queue = self._queues.get(user_id)
+            if queue is None:
+                continue  # Every request for this user was cancelled.
+
+            bucket = self._bucket(user_id, now)
+            if bucket.tokens < 1:
+                self._schedule(user_id, now)
+                continue
+
+            self._global.tokens -= 1
+            bucket.tokens -= 1
+
+            waiter = queue.popleft()
+            waiter.granted = True
+            waiter.event.set()
+            if waiter is self._timekeeper:
+                self._timekeeper = None
+
+            if queue:
+                self._schedule(user_id, now)  # Back of the queue.
+            else:
+                del self._queues[user_id]
+
+        self._sweep(now)
+        self._hand_off()
+
+    def _next_delay(self, now):
+        self._global.refill(now)
+        if self._ready:
+            return self._global.delay()
+
+        if self._throttled:
+            return max(self._throttled[0][0] - now, self._global.delay())
+
+        return None
+
+    def _hand_off(self):
+        """
+        Make sure some pending request is keeping time.
+        """
+        if self._timekeeper is not None or not self._queues:
+            return
+
+        waiter = next(iter(self._queues.values()))[0]
+        self._timekeeper = waiter
+        waiter.event.set()
+
+    def _cancel(self, user_id, waiter):
+        if not waiter.granted:
+            queue = self._queues[user_id]
+            queue.remove(waiter)
+            if not queue:
+                del self._queues[user_id]
+
+        if self._timekeeper is waiter:
+            self._timekeeper = None
+            self._hand_off()
+
+    def _sweep(self, now):
+        if now - self._last_sweep < self.sweep_interval:
+            return
+
+        self._last_sweep = now
+        for user_id, bucket in list(self._buckets.items()):
+            if user_id in self._queues:
+                continue
+
+            bucket.refill(now)
+            if bucket.full:
+                del self._buckets[user_id]  # Indistinguishable from a fresh bucket.
+
+
+class _Tenant(object):
+    """
+    Per-user state shared by every client handed out for that user.
+    """
+    __slots__ = ("auth", "refresh_lock", "__weakref__")
+
+    def __init__(self, auth):
+        self.auth = auth
+        self.refresh_lock = threading.Lock()
+
+
+class _PooledSpotify(Spotify):
+    def __init__(self, pool, user_id, tenant):
+        super().__init__(tenant.auth, market=pool.market, session=pool.session)
+        self.pool = pool
+        self.user_id = user_id
+        self.tenant = tenant
+        self.last_used = time.monotonic()
+
+    def _request(self, *args, **kwargs):
+        self.pool.scheduler.acquire(self.user_id)
+        self.pool._touch(self)
+
+        if self.auth.token_info.expired:
+            with self.tenant.refresh_lock:
+                if self.auth.token_info.expired:
+                    self.auth.token_info = self.auth.refresh_token(self.auth.token_info.refresh_token)
+
+        return super()._request(*args, **kwargs)
+
+
+class ClientPool(object):
+    """
+    Hands out per-user `Spotify` clients that share one connection pool and one `FairScheduler`.
+    Tokens are loaded lazily from `token_store` the first time a user is seen, and token refreshes go
+    through the shared session. Clients idle for longer than `idle_timeout` seconds, or beyond the
+    `max_clients` most recently used, are evicted.
+    """
+
+    def __init__(self, token_store, scheduler=None, market=None, max_clients=1000, idle_timeout=900.0,
+                 session=None, pool_maxsize=32):
+        self.token_store = token_store
+        self.scheduler = scheduler or FairScheduler()
+        self.market = market
+        self.max_clients = max_clients
+        self.idle_timeout = idle_timeout
+
+        if session is None:
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(pool_maxsize=pool_maxsize))
+
+        self.session = session
+        if getattr(token_store, "session", False) is None:
+            token_store.session = session  # Refreshes while loading share the pool's connections too.
+
+        self._clients = OrderedDict()  # user_id -> client, least recently used first.
+        self._tenants = weakref.WeakValueDictionary()  # user_id -> _Tenant, while any of its clients is alive.
+        self._loading = {}  # user_id -> Future of the _Tenant being loaded.
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._clients)
+
+    def get_client(self, user_id):
+        with self._lock:
+            client = self._clients.get(user_id)
+            if client is not None:
+                self._use(user_id, client)
+                return client
+
+            tenant = self._tenants.get(user_id)
+            future = None
+            if tenant is None:
+                future = self._loading.get(user_id)
+                loading = future is None
+                if loading:
+                    future = self._loading[user_id] = Future()
+
+        if future is not None:
+            # Loading may refresh the token over the network, so don't hold the lock for it.
+            tenant = self._load(user_id, future) if loading else future.result()
+
+        with self._lock:
+            client = self._clients.get(user_id)
+            if client is None:
+                client = _PooledSpotify(self, user_id, tenant)
+                self._clients[user_id] = client
+
+            self._use(user_id, client)
+
+        return client
+
+    def _load(self, user_id, future):
+        try:
+            auth = self.token_store.load(user_id)
+        except BaseException as e:
+            with self._lock:
+                del self._loading[user_id]
+
+            future.set_exception(e)
+            raise
+
+        auth.session = self.session
+        tenant = _Tenant(auth)
+
+        with self._lock:
+            del self._loading[user_id]
+            self._tenants[user_id] = tenant
+
+        future.set_result(tenant)
+        return tenant
+
+    def _touch(self, client):
+        with self._lock:
+            current = self._clients.get(client.user_id)
+            if current is None:
+                self._clients[client.user_id] = client  # Evicted while still in use.
+            elif current is not client:
+                client.last_used = time.monotonic()
+                return
+
+            self._use(client.user_id, client)
+
+    def _use(self, user_id, client):
+        client.last_used = time.monotonic()
+        self._clients.move_to_end(user_id)
+        self._evict()
+
+    def evict_idle(self):
+        with self._lock:
+            self._evict()
+
+    def _evict(self):
+        # `_clients` is kept in order of use, so idle clients are always at the front.
+        now = time.monotonic()
+        while self._clients:
+            user_id, client = next(iter(self._clients.items()))
+            if len(self._clients) <= self.max_clients and now - client.last_used < self.idle_timeout:
+                break
+
+            del self._clients[user_id]
+
+    def close(self):
+        with self._lock:
+            self._clients.clear()
+
+        self.session.close()
@@ -0,0 +1,162 @@
+import base64
+import io
+import os
+
+import pytest
+import requests
+
+import spotify.images
+from spotify.client import ClientError, Spotify, SpotifyError
+from spotify.images import ImageError, encode_cover_image, encoded_size, fit_cover_image, read_image
+
+
+class FakeAuth(object):
+    access_token = "token"
+
+
+def make_response(status_code, reason, content=b""):
+    response = requests.Response()
+    response.status_code = status_code
+    response.reason = reason
+    response._content = content
+    return response
+
+
+def make_jpeg(width, height, quality=95):
+    Image = pytest.importorskip("PIL.Image")
+    image = Image.frombytes("RGB", (width, height), os.urandom(width * height * 3))  # Noise compresses badly.
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, 3, 4, 100, 262144])
+def test_encoded_size(size):
+    assert encoded_size(size) == len(base64.b64encode(b"x" * size))
+
+
+def test_read_image_bytes_like_not_copied():
+    data = b"jpeg"
+    assert read_image(data) is data
+
+    view = memoryview(data)
+    assert read_image(view) is view
+
+
+def test_read_image_file_object_and_path(tmp_path):
+    path = tmp_path / "cover.jpg"
+    path.write_bytes(b"jpeg")
+
+    assert read_image(io.BytesIO(b"jpeg")) == b"jpeg"
+    assert read_image(str(path)) == b"jpeg"
+    assert read_image(path) == b"jpeg"
+
+
+def test_read_image_text_file_object():
+    with pytest.raises(ImageError):
+        read_image(io.StringIO("jpeg"))
+
+
+def test_fit_cover_image_small_image_untouched():
+    data = b"x" * 100
+    assert fit_cover_image(data) is data
+
+
+def test_fit_cover_image_without_pillow(monkeypatch):
+    monkeypatch.setattr(spotify.images, "Image", None)
+
+    with pytest.raises(ImageError):
+        fit_cover_image(b"x" * 1000, max_size=100)
+
+
+def test_fit_cover_image_undecodable():
+    pytest.importorskip("PIL")
+
+    with pytest.raises(ImageError):
+        fit_cover_image(b"x" * 1000, max_size=100)
+
+
+def test_fit_cover_image_decompression_bomb(monkeypatch):
+    data = make_jpeg(200, 200)
+    monkeypatch.setattr(spotify.images.Image, "MAX_IMAGE_PIXELS", 100)
+
+    with pytest.raises(ImageError):
+        fit_cover_image(data, max_size=100)
+
+
+def test_fit_cover_image_downsizes():
+    data = make_jpeg(800, 800)
+    max_size = 64 * 1024
+    assert encoded_size(len(data)) > max_size
+
+    fitted = fit_cover_image(data, max_size=max_size)
+    assert encoded_size(len(fitted)) <= max_size
+
+    from PIL import Image
+    with Image.open(io.BytesIO(fitted)) as image:
+        assert image.format == "JPEG"
+
+
+def test_fit_cover_image_too_small_to_fit():
+    data = make_jpeg(200, 200)
+
+    with pytest.raises(ImageError):
+        fit_cover_image(data, max_size=100)
+
+
+def test_encode_cover_image():
+    assert encode_cover_image(io.BytesIO(b"jpeg")) == base64.b64encode(b"jpeg")
+
+
+def test_upload_cover_image_keyword(monkeypatch):
+    client = Spotify(FakeAuth())
+    calls = []
+    monkeypatch.setattr(client, "_request", lambda *args, **kwargs: calls.append((args, kwargs)) or {})
+
+    client.upload_custom_playlist_cover_image("playlist", image_path=b"jpeg")
+
+    (args, kwargs), = calls
+    assert args == ("PUT", "playlists/playlist/images")
+    assert kwargs["payload"] == base64.b64encode(b"jpeg")
+
+
+def test_upload_cover_images(monkeypatch):
+    client = Spotify(FakeAuth())
+
+    def fake_request(method, endpoint, **kwargs):
+        return None if "bad" in endpoint else {"result": "Success"}
+
+    monkeypatch.setattr(client, "_request", fake_request)
+
+    results = client.upload_custom_playlist_cover_images({"good": b"jpeg",
+                                                          "bad": b"jpeg",
+                                                          "big": b"x" * 1000}, max_size=100)
+
+    assert results["good"] == {"result": "Success"}
+    assert isinstance(results["bad"], SpotifyError)
+    assert isinstance(results["big"], ImageError)
+
+
+def test_upload_cover_images_duplicate_ids():
+    client = Spotify(FakeAuth())
+
+    with pytest.raises(ClientError):
+        client.upload_custom_playlist_cover_images([("a", b"jpeg"), ("a", b"jpeg")])
+
+
+def test_upload_cover_images_responses(monkeypatch):
+    client = Spotify(FakeAuth())
+    responses = {"ok": make_response(200, "OK"),
+                 "accepted": make_response(202, "Accepted"),
+                 "forbidden": make_response(403, "Forbidden", b'{"error": {"status": 403}}')}
+
+    def fake_request(method, url, **kwargs):
+        return responses[url.split("/")[-2]]
+
+    monkeypatch.setattr(client.session, "request", fake_request)
+
+    results = client.upload_custom_playlist_cover_images({playlist_id: b"jpeg" for playlist_id in responses})
+
+    assert results["ok"] == {"result": "Success"}
+    assert results["accepted"] == {"result": "Success"}
+    assert isinstance(results["forbidden"], SpotifyError)
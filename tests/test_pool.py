@@ -0,0 +1,285 @@
+import json
+import threading
+import time
+
+import pytest
+import requests
+
+import spotify.pool
+from spotify.client import Spotify
+from spotify.pool import ClientPool, FairScheduler, FileTokenStore
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class FakeToken(object):
+    access_token = "token"
+    refresh_token = "refresh"
+
+    def __init__(self, expired=False):
+        self.expired = expired
+
+
+class FakeAuth(object):
+    def __init__(self, expired=False):
+        self.token_info = FakeToken(expired)
+        self.session = None
+        self.refreshes = 0
+
+    @property
+    def access_token(self):
+        return self.token_info.access_token
+
+    def refresh_token(self, refresh_token):
+        self.refreshes += 1
+        time.sleep(0.01)
+        return FakeToken()
+
+
+class FakeStore(object):
+    def __init__(self, delay=0.0, expired=False):
+        self.delay = delay
+        self.expired = expired
+        self.loads = []
+
+    def load(self, user_id):
+        self.loads.append(user_id)
+        time.sleep(self.delay)
+        return FakeAuth(expired=self.expired)
+
+
+class FakeSession(object):
+    def __init__(self):
+        self.posts = 0
+
+    def post(self, url, **kwargs):
+        self.posts += 1
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps({"access_token": "new", "token_type": "Bearer",
+                                        "expires_in": 3600, "scope": ""}).encode()
+        return response
+
+    def close(self):
+        pass
+
+
+def write_token(tmp_path, user_id, expires_at):
+    token = {"access_token": "old", "token_type": "Bearer", "expires_in": 3600,
+             "expires_at": expires_at, "scope": [], "refresh_token": "refresh"}
+    (tmp_path / f"{user_id}.json").write_text(json.dumps(token))
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(spotify.pool, "time", clock)
+    return clock
+
+
+@pytest.fixture(autouse=True)
+def no_network(monkeypatch):
+    monkeypatch.setattr(Spotify, "_request", lambda self, *args, **kwargs: {"result": "Success"})
+
+
+def run_threads(targets):
+    threads = [threading.Thread(target=target) for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+        assert not thread.is_alive()
+
+
+def test_scheduler_global_budget():
+    scheduler = FairScheduler(rate=50, user_rate=1000, burst=1)
+
+    start = time.monotonic()
+    run_threads([lambda u=u: scheduler.acquire(u) for u in range(11)])
+
+    assert time.monotonic() - start >= 10 / 50 * 0.9
+
+
+def test_scheduler_user_budget():
+    scheduler = FairScheduler(rate=1000, user_rate=20, user_burst=1)
+
+    start = time.monotonic()
+    run_threads([lambda: scheduler.acquire("user")] * 5)
+
+    assert time.monotonic() - start >= 4 / 20 * 0.9
+
+
+def test_scheduler_round_robin():
+    scheduler = FairScheduler(rate=40, user_rate=1000, burst=1)
+    order = []
+
+    def request(user_id):
+        scheduler.acquire(user_id)
+        order.append(user_id)
+
+    heavy = [lambda: request("heavy")] * 20
+    threads = [threading.Thread(target=target) for target in heavy]
+    for thread in threads:
+        thread.start()
+
+    time.sleep(0.05)  # Let the heavy user queue up first.
+    run_threads([lambda u=u: request(u) for u in "abc"])
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert len(order) == 23
+    assert max(order.index(u) for u in "abc") < 10
+
+
+def test_scheduler_sweeps_idle_buckets():
+    scheduler = FairScheduler(rate=1000, user_rate=1000, sweep_interval=0.0)
+
+    scheduler.acquire("idle")
+    time.sleep(0.01)
+    scheduler.acquire("other")
+
+    assert "idle" not in scheduler._buckets
+
+
+def test_scheduler_keeps_depleted_buckets():
+    scheduler = FairScheduler(rate=1000, user_rate=0.1, sweep_interval=0.0)
+
+    scheduler.acquire("depleted")
+    scheduler.acquire("other")
+
+    assert "depleted" in scheduler._buckets
+
+
+def test_scheduler_cancelled_request(monkeypatch):
+    scheduler = FairScheduler(rate=1000, user_rate=1, user_burst=1)
+    scheduler.acquire("user")
+
+    def interrupt(self, timeout=None):
+        raise KeyboardInterrupt
+
+    with monkeypatch.context() as patch:
+        patch.setattr(threading.Event, "wait", interrupt)
+        with pytest.raises(KeyboardInterrupt):
+            scheduler.acquire("user")
+
+    assert "user" not in scheduler._queues
+    assert scheduler._timekeeper is None
+    scheduler.acquire("other")
+
+
+def test_pool_evicts_idle_clients(clock):
+    pool = ClientPool(FakeStore(), scheduler=FairScheduler(rate=1000, user_rate=1000), idle_timeout=60)
+
+    a = pool.get_client("a")
+    pool.get_client("b")
+    clock.now += 61
+    a.get_current_user_profile()
+    pool.evict_idle()
+
+    assert list(pool._clients) == ["a"]
+
+
+def test_pool_evicts_least_recently_used(clock):
+    pool = ClientPool(FakeStore(), scheduler=FairScheduler(rate=1000, user_rate=1000), max_clients=2)
+
+    a = pool.get_client("a")
+    pool.get_client("b")
+    clock.now += 1
+    a.get_current_user_profile()
+    clock.now += 1
+    pool.get_client("c")
+
+    assert list(pool._clients) == ["a", "c"]
+
+
+def test_pool_loads_each_user_once():
+    store = FakeStore(delay=0.05)
+    pool = ClientPool(store)
+    clients = []
+
+    run_threads([lambda: clients.append(pool.get_client("user"))] * 8)
+
+    assert store.loads == ["user"]
+    assert all(client is clients[0] for client in clients)
+    assert clients[0].auth.session is pool.session
+
+
+def test_pool_load_failure_is_not_cached():
+    class FailingStore(FakeStore):
+        def load(self, user_id):
+            super().load(user_id)
+            raise KeyError(user_id)
+
+    pool = ClientPool(FailingStore())
+
+    for _ in range(2):
+        with pytest.raises(KeyError):
+            pool.get_client("user")
+
+    assert pool.token_store.loads == ["user", "user"]
+    assert not pool._loading
+
+
+def test_pool_evicted_client_shares_tenant():
+    store = FakeStore(expired=True)
+    pool = ClientPool(store, scheduler=FairScheduler(rate=1000, user_rate=1000))
+
+    old = pool.get_client("user")
+    pool._clients.clear()
+    new = pool.get_client("user")
+
+    assert new is not old
+    assert new.auth is old.auth
+    assert store.loads == ["user"]
+
+    run_threads([old.get_current_user_profile, new.get_current_user_profile])
+    assert old.auth.refreshes == 1
+
+
+def test_file_token_store_rejects_paths(tmp_path):
+    store = FileTokenStore(str(tmp_path), "id", "secret", "http://localhost")
+
+    assert store.path("user") == str(tmp_path / "user.json")
+    with pytest.raises(ValueError):
+        store.path("../user")
+
+
+def test_file_token_store_keeps_fresh_token(tmp_path):
+    session = FakeSession()
+    write_token(tmp_path, "user", time.time() + 600)
+
+    auth = FileTokenStore(str(tmp_path), "id", "secret", "http://localhost", session=session).load("user")
+
+    assert auth.access_token == "old"
+    assert session.posts == 0
+
+
+def test_file_token_store_refreshes_old_token(tmp_path):
+    session = FakeSession()
+    write_token(tmp_path, "user", time.time() - 86400)
+
+    auth = FileTokenStore(str(tmp_path), "id", "secret", "http://localhost", session=session).load("user")
+
+    assert auth.access_token == "new"
+    assert not auth.token_info.expired
+    assert session.posts == 1
+    assert json.loads((tmp_path / "user.json").read_text())["access_token"] == "new"
+
+
+def test_pool_shares_session_with_token_store(tmp_path):
+    session = FakeSession()
+    write_token(tmp_path, "user", time.time() - 86400)
+    store = FileTokenStore(str(tmp_path), "id", "secret", "http://localhost")
+
+    pool = ClientPool(store, session=session)
+    client = pool.get_client("user")
+
+    assert store.session is session
+    assert client.auth.session is session
+    assert session.posts == 1